@@ -1,10 +1,14 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
 import os
+import hashlib
 import requests
 import re
 
+from simulation import simulate
+
+EMAIL_RE = re.compile(r"^[\w\.-]+@[\w\.-]+\.\w+$")
+
 # =======================
 # 🎯 Streamlit Page Setup
 # =======================
@@ -29,20 +33,36 @@ if not GOOGLE_FORM_URL:
 if not GOOGLE_ENTRY_EMAIL:
     GOOGLE_ENTRY_EMAIL = os.environ.get("GOOGLE_ENTRY_EMAIL")
 
+# فقط ارسال موفق کش می‌شود (خطا بالا می‌رود و کش نمی‌شود)؛ کلید کش هش ایمیل است
+@st.cache_data(ttl=3600, show_spinner=False)
+def post_email_to_google_form(email_hash, _email):
+    payload = {GOOGLE_ENTRY_EMAIL: _email}
+    resp = requests.post(GOOGLE_FORM_URL, data=payload, timeout=10)
+    if resp.status_code not in (200, 302):
+        raise RuntimeError(f"Status {resp.status_code}")
+    return True
+
 def submit_email_to_google_form(email):
     if not GOOGLE_FORM_URL or not GOOGLE_ENTRY_EMAIL:
         return False, "Google Form config missing."
 
-    payload = {GOOGLE_ENTRY_EMAIL: email}
+    email_hash = hashlib.sha256(email.encode()).hexdigest()
 
     try:
-        resp = requests.post(GOOGLE_FORM_URL, data=payload, timeout=10)
-        if resp.status_code in (200, 302):
-            return True, None
-        return False, f"Status {resp.status_code}"
+        post_email_to_google_form(email_hash, email)
+        return True, None
     except Exception as e:
         return False, str(e)
 
+# =======================
+# 📈 Cached Simulation
+# =======================
+# با پارامترهای یکسان، نتیجه مستقیم از کش برمی‌گردد (seed ثابت = نتیجهٔ یکسان)؛
+# پارامترها اعشاری و آزادند، پس اندازهٔ کش محدود است
+@st.cache_data(max_entries=128)
+def run_mc(win_rate, risk_reward, risk_per_trade, n_trades, initial_capital, n_simulations=1000, seed=0):
+    return simulate(n_simulations, int(n_trades), win_rate, risk_reward, risk_per_trade, initial_capital, seed)
+
 # =======================
 # 🔧 User Inputs
 # =======================
@@ -69,8 +89,7 @@ run_simulation = st.button("🚀 Run Simulation")
 if run_simulation:
 
     # ❌ جلوگیری از اجرای شبیه‌سازی بدون ایمیل (مثل کد قبلی)
-    email_pattern = r"^[\w\.-]+@[\w\.-]+\.\w+$"
-    if not email or not re.match(email_pattern, email):
+    if not email or not EMAIL_RE.match(email):
         st.error("لطفاً یک ایمیل معتبر وارد کنید.")
         st.stop()
 
@@ -82,70 +101,20 @@ if run_simulation:
 
     st.success("ایمیل شما با موفقیت ثبت شد. شبیه‌سازی آغاز می‌شود...")
 
-    # --------------------------
-    # ادامهٔ کد شما — بدون هیچ تغییری
-    # --------------------------
-
-    n_simulations = 1000
-    results = []
-    drawdowns = []
-    consecutive_wins_list = []
-    consecutive_losses_list = []
-
-    for _ in range(n_simulations):
-        balance = initial_capital
-        balances = [balance]
-        max_consec_win = 0
-        max_consec_loss = 0
-        current_win = 0
-        current_loss = 0
-
-        peak = balance
-        max_dd = 0
-
-        for _ in range(int(n_trades)):
-            win = np.random.rand() < win_rate / 100
-            if win:
-                balance *= (1 + (risk_per_trade / 100) * risk_reward)
-                current_win += 1
-                max_consec_win = max(max_consec_win, current_win)
-                current_loss = 0
-            else:
-                balance *= (1 - (risk_per_trade / 100))
-                current_loss += 1
-                max_consec_loss = max(max_consec_loss, current_loss)
-                current_win = 0
-
-            peak = max(peak, balance)
-            dd = (peak - balance) / peak
-            max_dd = max(max_dd, dd)
-
-            balances.append(balance)
-
-        results.append(balances)
-        drawdowns.append(max_dd)
-        consecutive_wins_list.append(max_consec_win)
-        consecutive_losses_list.append(max_consec_loss)
-
-    results = np.array(results)
-    end_balances = results[:, -1]
-
-    best_result = np.max(end_balances)
-    worst_result = np.min(end_balances)
-    median_result = np.median(end_balances)
-
-    best_path = results[np.argmax(end_balances)]
-    worst_path = results[np.argmin(end_balances)]
-    median_path = results[np.argsort(end_balances)[len(end_balances)//2]]
+    mc = run_mc(win_rate, risk_reward, risk_per_trade, n_trades, initial_capital)
+
+    best_result, worst_result, _ = np.take(mc.end_balances, mc.path_indices)
+    median_result = np.median(mc.end_balances)
+    best_path, worst_path, median_path = mc.best_path, mc.worst_path, mc.median_path
 
     best_return = (best_result / initial_capital - 1) * 100
     worst_return = (worst_result / initial_capital - 1) * 100
     median_return = (median_result / initial_capital - 1) * 100
 
     expectancy_r = ((win_rate / 100) * risk_reward) - ((1 - win_rate / 100) * 1)
-    avg_drawdown = np.mean(drawdowns) * 100
-    avg_max_win = int(np.mean(consecutive_wins_list))
-    avg_max_loss = int(np.mean(consecutive_losses_list))
+    avg_drawdown = mc.drawdowns.mean() * 100
+    avg_max_win = int(mc.win_runs.mean())
+    avg_max_loss = int(mc.loss_runs.mean())
 
     st.subheader("Results")
 
@@ -168,21 +137,27 @@ if run_simulation:
 
     st.subheader("Trading Equity Graph Result")
 
-    fig, ax = plt.subplots(figsize=(8, 5))
-    ax.plot(best_path, color='green', label='Best Case', linewidth=1.8)
-    ax.plot(worst_path, color='red', label='Worst Case', linewidth=1.8)
-    ax.plot(median_path, color='cyan', label='Most Probable', linewidth=2.5)
-
-    ax.set_title("Trading Equity Curve", color='white', fontsize=13)
-    ax.set_xlabel("Number of Trades")
-    ax.set_ylabel("Account Balance ($)")
-    ax.grid(alpha=0.2)
-    ax.legend(facecolor='black', labelcolor='white')
-    fig.patch.set_facecolor('#111')
-    ax.set_facecolor('#111')
-    plt.tick_params(colors='white')
-
-    st.pyplot(fig)
+    # Plotly فقط وقتی نمودار لازم است import می‌شود و در مرورگر رسم می‌شود
+    import plotly.graph_objects as go
+
+    step = max(1, len(median_path) // 2000)
+    trades = np.arange(len(median_path))[::step]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=trades, y=best_path[::step], name='Best Case', line=dict(color='green', width=1.8)))
+    fig.add_trace(go.Scatter(x=trades, y=worst_path[::step], name='Worst Case', line=dict(color='red', width=1.8)))
+    fig.add_trace(go.Scatter(x=trades, y=median_path[::step], name='Most Probable', line=dict(color='cyan', width=2.5)))
+
+    fig.update_layout(
+        template='plotly_dark',
+        title="Trading Equity Curve",
+        xaxis_title="Number of Trades",
+        yaxis_title="Account Balance ($)",
+        paper_bgcolor='#111',
+        plot_bgcolor='#111',
+    )
+
+    st.plotly_chart(fig, use_container_width=True)
 
     st.markdown(
         """
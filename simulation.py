@@ -0,0 +1,231 @@
+from collections import namedtuple
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+    prange = range
+
+# =======================
+# 🎲 Per-simulation RNG (SplitMix64)
+# =======================
+# هر شبیه‌سازی جریان تصادفی مستقل خودش را دارد تا داخل prange
+# هیچ وضعیت مشترکی بین تردها نباشد و بتوان یک مسیر را دوباره ساخت.
+_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+_S11 = np.uint64(11)
+_S27 = np.uint64(27)
+_S30 = np.uint64(30)
+_S31 = np.uint64(31)
+_TO_UNIT = 1.0 / (1 << 53)
+
+
+@njit(cache=True)
+def _mix(z):
+    z = (z ^ (z >> _S30)) * _MIX1
+    z = (z ^ (z >> _S27)) * _MIX2
+    return z ^ (z >> _S31)
+
+
+@njit(cache=True)
+def _seed_state(seed, sim):
+    return _mix(np.uint64(seed) + np.uint64(sim) * _GAMMA)
+
+
+@njit(cache=True)
+def _next_uniform(state):
+    state = state + _GAMMA
+    return state, (_mix(state) >> _S11) * _TO_UNIT
+
+
+def trade_multipliers(win_rate, risk_reward, risk_per_trade):
+    # احتمال برد و ضریب سرمایه در برد/باخت فقط یک بار محاسبه و به کرنل‌ها داده می‌شود
+    p = win_rate / 100
+    up = 1 + (risk_per_trade / 100) * risk_reward
+    down = 1 - (risk_per_trade / 100)
+    return p, up, down
+
+# =======================
+# 📈 Monte Carlo Kernels
+# =======================
+@njit(cache=True, fastmath=True)
+def stats_row(sim, n_trades, p, up, down, initial_capital, seed):
+    # نتیجه، drawdown و رشته‌های برد/باخت یک شبیه‌سازی در یک گذر ادغام‌شده؛
+    # برد/باخت تصادفی است و پیش‌بینی‌پذیر نیست، پس بدنهٔ حلقه بدون شاخه نوشته شده
+    state = _seed_state(seed, sim)
+    balance = initial_capital
+    peak = initial_capital
+    max_dd = 0.0
+    current_win = 0
+    current_loss = 0
+    max_win = 0
+    max_loss = 0
+
+    for _ in range(n_trades):
+        state, u = _next_uniform(state)
+        win = u < p
+        balance *= up if win else down
+        peak = max(peak, balance)
+        max_dd = max(max_dd, (peak - balance) / peak)
+        current_win = (current_win + 1) * win
+        current_loss = (current_loss + 1) * (not win)
+        max_win = max(max_win, current_win)
+        max_loss = max(max_loss, current_loss)
+
+    return balance, max_dd, max_win, max_loss
+
+
+@njit(parallel=True, cache=True, fastmath=True)
+def run_mc_numba(n_sim, n_trades, p, up, down, initial_capital, seed):
+    end_balances = np.empty(n_sim)
+    max_dds = np.empty(n_sim)
+    win_runs = np.empty(n_sim, dtype=np.int32)
+    loss_runs = np.empty(n_sim, dtype=np.int32)
+
+    for s in prange(n_sim):
+        # همهٔ متغیرهای تجمعی محلیِ stats_row هستند (بدون reduction مشترک)
+        end_balances[s], max_dds[s], win_runs[s], loss_runs[s] = stats_row(
+            s, n_trades, p, up, down, initial_capital, seed
+        )
+
+    return end_balances, max_dds, win_runs, loss_runs
+
+
+@njit(cache=True, fastmath=True)
+def replay_path_numba(sim, n_trades, p, up, down, initial_capital, seed):
+    # فقط منحنی سرمایهٔ یک شبیه‌سازی را با همان جریان تصادفی دوباره می‌سازد
+    path = np.empty(n_trades + 1)
+    path[0] = initial_capital
+    state = _seed_state(seed, sim)
+    balance = initial_capital
+    for t in range(n_trades):
+        state, u = _next_uniform(state)
+        balance *= up if u < p else down
+        path[t + 1] = balance
+
+    return path
+
+
+# =======================
+# 🧮 NumPy Fallback (بدون Numba)
+# =======================
+_CHUNK_DRAWS = 1 << 18
+
+
+def max_run_length(mask, counts=None, resets=None):
+    # طول بیشترین رشتهٔ متوالی True در هر سطر؛ counts و resets بافرهای int32
+    # اختیاری هم‌اندازهٔ mask هستند تا آرایهٔ موقت ساخته نشود
+    counts = np.cumsum(mask, axis=1, dtype=np.int32, out=counts)
+    if resets is None:
+        resets = np.empty_like(counts)
+    np.copyto(resets, counts)
+    np.copyto(resets, 0, where=mask)
+    np.maximum.accumulate(resets, axis=1, out=resets)
+    np.subtract(counts, resets, out=counts)
+    return counts.max(axis=1)
+
+
+def _row_generator(seed, first_row, n_trades):
+    # هر سطر دقیقاً n_trades عدد از PCG64 مصرف می‌کند، پس مستقیم به سطر first_row می‌رویم
+    bit_generator = np.random.PCG64(seed)
+    bit_generator.advance(int(first_row) * n_trades)
+    return np.random.Generator(bit_generator)
+
+
+def run_mc_numpy(n_sim, n_trades, p, up, down, initial_capital, seed):
+    end_balances = np.empty(n_sim)
+    max_dds = np.empty(n_sim)
+    win_runs = np.empty(n_sim, dtype=np.int32)
+    loss_runs = np.empty(n_sim, dtype=np.int32)
+
+    # اعداد تصادفی به‌صورت دسته‌ای از سطرها تولید می‌شوند تا حافظه محدود بماند؛
+    # ترتیب مصرف PCG64 همان تولید یکجا است، پس replay_path_numpy درست می‌ماند
+    rng = np.random.default_rng(seed)
+    rows_per_chunk = max(1, _CHUNK_DRAWS // n_trades)
+    draws = np.empty((min(rows_per_chunk, n_sim), n_trades))
+    wins_buf = np.empty(draws.shape, dtype=np.bool_)
+    curves_buf = np.empty(draws.shape)
+    peaks_buf = np.empty(draws.shape)
+    counts_buf = np.empty(draws.shape, dtype=np.int32)
+    resets_buf = np.empty(draws.shape, dtype=np.int32)
+
+    for start in range(0, n_sim, rows_per_chunk):
+        stop = min(start + rows_per_chunk, n_sim)
+        n_rows = stop - start
+        chunk = draws[:n_rows]
+        rng.random(out=chunk)
+        wins = np.less(chunk, p, out=wins_buf[:n_rows])
+
+        # منحنی‌ها فقط برای محاسبهٔ drawdown ساخته می‌شوند و نگه داشته نمی‌شوند؛
+        # float64 می‌مانند چون با ورودی‌های مجاز برنامه از بازهٔ float32 بیرون می‌زنند
+        # همهٔ مراحل داخل بافرهای از پیش ساخته انجام می‌شوند (بدون آرایهٔ موقت)
+        curves = curves_buf[:n_rows]
+        curves.fill(down)
+        np.copyto(curves, up, where=wins)
+        np.cumprod(curves, axis=1, out=curves)
+        curves *= initial_capital
+        end_balances[start:stop] = curves[:, -1]
+
+        running_peak = peaks_buf[:n_rows]
+        np.maximum.accumulate(curves, axis=1, out=running_peak)
+        np.maximum(running_peak, initial_capital, out=running_peak)
+        np.divide(curves, running_peak, out=running_peak)
+        max_dds[start:stop] = 1 - running_peak.min(axis=1)
+
+        counts = counts_buf[:n_rows]
+        resets = resets_buf[:n_rows]
+        win_runs[start:stop] = max_run_length(wins, counts, resets)
+        np.logical_not(wins, out=wins)
+        loss_runs[start:stop] = max_run_length(wins, counts, resets)
+
+    return end_balances, max_dds, win_runs, loss_runs
+
+
+def replay_path_numpy(sim, n_trades, p, up, down, initial_capital, seed):
+    wins = _row_generator(seed, sim, n_trades).random(n_trades) < p
+
+    path = np.empty(n_trades + 1)
+    path[0] = initial_capital
+    steps = path[1:]
+    steps.fill(down)
+    np.copyto(steps, up, where=wins)
+    np.cumprod(steps, out=steps)
+    steps *= initial_capital
+    return path
+
+
+run_mc = run_mc_numba if HAS_NUMBA else run_mc_numpy
+replay_path = replay_path_numba if HAS_NUMBA else replay_path_numpy
+
+
+# =======================
+# 📦 Simulation Entry Point
+# =======================
+SimulationResult = namedtuple(
+    "SimulationResult",
+    ["end_balances", "drawdowns", "win_runs", "loss_runs", "path_indices", "best_path", "worst_path", "median_path"],
+)
+
+
+def simulate(n_sim, n_trades, win_rate, risk_reward, risk_per_trade, initial_capital, seed):
+    p, up, down = trade_multipliers(win_rate, risk_reward, risk_per_trade)
+    sim_args = (n_trades, p, up, down, initial_capital, seed)
+    end_balances, drawdowns, win_runs, loss_runs = run_mc(n_sim, *sim_args)
+
+    k = n_sim // 2
+    path_indices = np.array([np.argmax(end_balances), np.argmin(end_balances), np.argpartition(end_balances, k)[k]])
+
+    # فقط سه مسیر نمایش داده‌شده دوباره ساخته می‌شوند
+    best_path, worst_path, median_path = (replay_path(i, *sim_args) for i in path_indices)
+
+    return SimulationResult(
+        end_balances, drawdowns, win_runs, loss_runs, path_indices, best_path, worst_path, median_path
+    )